@@ -6,7 +6,14 @@ import os
 import tempfile
 import pandas as pd
 import plotly.express as px
+from check_models import ModelHealth, TRANSCRIBE_MODEL, TTS_MODEL
+from model_router import LatencyStats, route_completion, TURN_BUDGET_S, FALLBACK_RESPONSES
+from build_voice_pack import VOICES, PACK_PATH, INDEX_PATH, read_pack, find_clip
+from profiling import Profiler, profiling_enabled
 import base64
+import time
+import threading
+import uuid
 
 # -----------------------------------------------------------------------------
 # 1. Page Configuration & Custom CSS
@@ -183,16 +190,25 @@ Experience:
 """
 
 def get_api_key():
-    if "OPENAI_API_KEY" in st.secrets:
-        openai.api_key = st.secrets["OPENAI_API_KEY"]
-        return True
+    try:
+        if "OPENAI_API_KEY" in st.secrets:
+            openai.api_key = st.secrets["OPENAI_API_KEY"]
+            return True
+    except FileNotFoundError:
+        # No secrets.toml at all; newer Streamlit raises instead of returning empty
+        pass
     return False
 
+@st.cache_resource
+def get_client():
+    # One client per process so connections opened by the warm-up probe are reused
+    return openai.OpenAI(api_key=openai.api_key)
+
 def transcribe_audio(audio_file):
     try:
-        client = openai.OpenAI(api_key=openai.api_key)
+        client = get_client()
         transcription = client.audio.transcriptions.create(
-            model="whisper-1", 
+            model=TRANSCRIBE_MODEL, 
             file=audio_file
         )
         return transcription.text
@@ -200,6 +216,10 @@ def transcribe_audio(audio_file):
         st.error(f"Transcription Error: {e}")
         return None
 
+@st.cache_resource
+def get_latency_stats():
+    return LatencyStats()
+
 def get_responses(user_input):
     prompt = f"""
     You are an AI assistant for a speech-impaired user (Shriya). 
@@ -211,24 +231,50 @@ def get_responses(user_input):
     Output format: First Response Text|Second Response Text|Third Response Text
     """
     try:
-        client = openai.OpenAI(api_key=openai.api_key)
-        response = client.chat.completions.create(
-            model="gpt-5.2",
-            messages=[{"role": "system", "content": "You are a helpful assistant."},
-                      {"role": "user", "content": prompt}]
-        )
-        text = response.choices[0].message.content.strip()
-        options = text.split('|')
-        while len(options) < 3: options.append("...")
-        return options[:3]
+        client = get_client().with_options(timeout=TURN_BUDGET_S, max_retries=0)
+        text, _ = route_completion(client, prompt, get_latency_stats())
     except Exception as e:
         return ["Error.", "Check Key.", "Try again."]
+    if text is None:
+        return FALLBACK_RESPONSES
+
+    options = text.strip().split('|')
+    while len(options) < 3: options.append("...")
+    return options[:3]
+
+@st.cache_resource(max_entries=1)
+def _map_voice_pack(pack_path, index_path, mtimes):
+    # mtimes is only part of the cache key, so a rebuilt pack is remapped
+    return read_pack(pack_path, index_path, TTS_MODEL)
+
+def load_voice_pack(pack_path=PACK_PATH, index_path=INDEX_PATH):
+    """Memory-maps the clip pack written by build_voice_pack.py.
+
+    Returns None if the pack is absent, unreadable, mid-rebuild or was
+    rendered with a different TTS_MODEL. Absence is checked on every call, so
+    a pack built while the app is running is picked up without a restart.
+    """
+    try:
+        mtimes = (os.path.getmtime(pack_path), os.path.getmtime(index_path))
+        return _map_voice_pack(pack_path, index_path, mtimes)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def packed_clip(text, voice):
+    pack = load_voice_pack()
+    if pack is None:
+        return None
+    return find_clip(pack, text, voice)
 
 def speak_text(text, voice="shimmer"):
+    clip = packed_clip(text, voice)
+    if clip is not None:
+        st.audio(clip, format="audio/mp3", start_time=0, autoplay=True)
+        return
     try:
-        client = openai.OpenAI(api_key=openai.api_key)
+        client = get_client()
         response = client.audio.speech.create(
-            model="tts-1",
+            model=TTS_MODEL,
             voice=voice,
             input=text
         )
@@ -238,6 +284,13 @@ def speak_text(text, voice="shimmer"):
     except Exception as e:
         st.error(f"TTS Error: {e}")
 
+@st.cache_resource
+def get_model_health():
+    """Fetches the catalog and probes every configured model in the background, again every CATALOG_TTL_S."""
+    health = ModelHealth(get_client())
+    threading.Thread(target=health.run_forever, daemon=True).start()
+    return health
+
 # -----------------------------------------------------------------------------
 # 3. Content Pages
 # -----------------------------------------------------------------------------
@@ -623,6 +676,9 @@ def render_prototype():
     if not get_api_key():
         st.error("⚠️ OpenAI API Key not found. Please check secrets.")
     else:
+        # Starts the background warm-up the first time anyone opens the prototype
+        get_model_health()
+
         # 1. Conversational Prompt (Above Recorder)
         st.markdown("<br><h4 style='color: #00f2ff;'>Converse with Shriya - please record a question</h4>", unsafe_allow_html=True)
         st.markdown("<p style='color: #a0aec0; font-size: 0.9rem;'>Try asking: <i>'Where do you study?', 'Tell me about your startup Stride.', 'What did you do at Deloitte?'</i></p>", unsafe_allow_html=True)
@@ -649,14 +705,17 @@ def render_prototype():
         with vc2:
             voice_choice = st.selectbox(
                 "Voice", 
-                ["shimmer", "alloy", "echo", "fable", "onyx", "nova"], 
+                VOICES, 
                 label_visibility="collapsed"
             )
+            pack = load_voice_pack()
+            if pack is not None and st.button("🔊 Preview voice", use_container_width=True):
+                speak_text(pack[0]["preview"], voice_choice)
 
         # 4. Response Area (Below Voice Selector)
         if final_input:
             if "predicted_responses" not in st.session_state or st.session_state.get('last_input') != final_input:
-                with st.spinner("🧠 Thinking (GPT-5.2)..."):
+                with st.spinner("🧠 Thinking..."):
                     st.session_state.predicted_responses = get_responses(final_input)
                     st.session_state.last_input = final_input
             
@@ -673,6 +732,49 @@ def render_prototype():
             
     st.markdown("</div>", unsafe_allow_html=True)
 
+@st.cache_resource
+def get_profiler():
+    profiler = Profiler()
+    profiler.start()
+    return profiler
+
+def render_admin():
+    st.title("🩺 Admin: Memory & Resources")
+    profiler = get_profiler()
+    if st.button("Take snapshot now"):
+        try:
+            profiler.sample()
+        except Exception as e:
+            st.error(f"Snapshot Error: {e}")
+
+    last_error = profiler.last_error
+    if last_error is not None:
+        st.warning(f"Last profiler error at {time.strftime('%H:%M:%S', time.localtime(last_error['ts']))}: {last_error['error']}")
+
+    sample = profiler.latest
+    if sample is None:
+        st.info("No snapshot yet.")
+        return
+
+    st.caption(f"Last snapshot: {time.strftime('%H:%M:%S', time.localtime(sample['ts']))} · written to {profiler.metrics_path}")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Traced memory", f"{sample['traced_kib'] / 1024:.1f} MiB")
+    m2.metric("Traced peak", f"{sample['traced_peak_kib'] / 1024:.1f} MiB")
+    m3.metric("Open files", sample["open_files"] if sample["open_files"] is not None else "n/a")
+    m4.metric("Temp MP3s", f"{sample['temp']['mp3_files']} ({sample['temp']['mp3_bytes'] / 1024:.0f} KiB)")
+
+    st.markdown("##### Sessions")
+    sessions = sample["sessions"]
+    if sessions:
+        df_sessions = pd.DataFrame(
+            [{"Session": sid, "State (KiB)": round(s["bytes"] / 1024, 1), "Largest key": max(s["keys"], key=s["keys"].get, default="")}
+             for sid, s in sessions.items()]
+        ).sort_values("State (KiB)", ascending=False)
+        st.dataframe(df_sessions, use_container_width=True, hide_index=True)
+
+    st.markdown("##### Top allocations (diff vs previous snapshot)")
+    st.dataframe(pd.DataFrame(sample["top_allocations"]), use_container_width=True, hide_index=True)
+
 # -----------------------------------------------------------------------------
 # 4. Navigation & Main
 # -----------------------------------------------------------------------------
@@ -685,9 +787,18 @@ PAGES = {
     "Project Idea": render_idea,
     "Project Plan": render_plan
 }
+PAGE_ICONS = ["house", "mic", "file-text", "bullseye", "lightbulb", "calendar"]
+
+if profiling_enabled():
+    PAGES["Admin"] = render_admin
+    PAGE_ICONS.append("speedometer2")
 
 from streamlit_option_menu import option_menu
 
+if "health" in st.query_params:
+    st.json(get_model_health().report() if get_api_key() else {"ready": False, "error": "OpenAI API key not found"})
+    st.stop()
+
 with st.sidebar:
     st.image("Logo.png", width=200) 
     st.markdown("### Navigation")
@@ -701,7 +812,7 @@ with st.sidebar:
     selection = option_menu(
         menu_title=None,
         options=list(PAGES.keys()),
-        icons=["house", "mic", "file-text", "bullseye", "lightbulb", "calendar"],
+        icons=PAGE_ICONS,
         menu_icon="cast",
         default_index=nav_index,
         styles={
@@ -723,3 +834,9 @@ with st.sidebar:
 # Render selected page
 page_func = PAGES[selection]
 page_func()
+
+if profiling_enabled():
+    if "profile_session_id" not in st.session_state:
+        st.session_state["profile_session_id"] = uuid.uuid4().hex[:8]
+    # session_state is bound to the script thread, so the sampler gets a shallow copy of it
+    get_profiler().register_session(st.session_state["profile_session_id"], st.session_state.to_dict())
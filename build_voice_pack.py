@@ -0,0 +1,136 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from check_models import TTS_MODEL
+from model_router import FALLBACK_RESPONSES
+
+# Renders the phrase bank in every voice and packs the clips into a single
+# blob (voice_pack.bin) plus an offset index (voice_pack.json) that app.py
+# memory-maps at startup. Clips are cached under voice_pack_parts/, so an
+# interrupted run picks up where it left off. app.py imports VOICES and the
+# pack paths from here.
+
+VOICES = ["shimmer", "alloy", "echo", "fable", "onyx", "nova"]
+PREVIEW_PHRASE = "Hi, this is how I will sound when I speak for you."
+PHRASES = [
+    PREVIEW_PHRASE,
+    "Yes.",
+    "No.",
+    "Thank you.",
+    *FALLBACK_RESPONSES,
+    "I need a break.",
+    "Nice to meet you.",
+    "Please give me a moment to respond.",
+]
+MAX_WORKERS = 4
+PARTS_DIR = "voice_pack_parts"
+PACK_PATH = "voice_pack.bin"
+INDEX_PATH = "voice_pack.json"
+
+def part_path(voice, phrase):
+    digest = hashlib.sha1(f"{TTS_MODEL}|{voice}|{phrase}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(PARTS_DIR, voice, f"{digest}.mp3")
+
+def render(client, voice, phrase):
+    path = part_path(voice, phrase)
+    response = client.audio.speech.create(model=TTS_MODEL, voice=voice, input=phrase)
+    # Write to a temp name first so a killed run never leaves a truncated clip behind
+    tmp = path + ".part"
+    response.stream_to_file(tmp)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+def write_pack():
+    clips = {}
+    offset = 0
+    with open(PACK_PATH + ".part", "wb") as pack:
+        for voice in VOICES:
+            clips[voice] = {}
+            for phrase in PHRASES:
+                with open(part_path(voice, phrase), "rb") as f:
+                    data = f.read()
+                pack.write(data)
+                clips[voice][phrase] = [offset, len(data)]
+                offset += len(data)
+    # Both files are swapped in atomically; pack_bytes lets readers reject a new
+    # pack seen with the old index in the moment between the two replaces
+    os.replace(PACK_PATH + ".part", PACK_PATH)
+    with open(INDEX_PATH + ".part", "w") as f:
+        json.dump({"model": TTS_MODEL, "preview": PREVIEW_PHRASE, "pack_bytes": offset, "clips": clips}, f, indent=1)
+    os.replace(INDEX_PATH + ".part", INDEX_PATH)
+    return offset
+
+def read_pack(pack_path=PACK_PATH, index_path=INDEX_PATH, model=TTS_MODEL):
+    """Memory-maps a pack and its index.
+
+    Returns None if the index was rendered with a different model or doesn't
+    describe this pack. Missing or unreadable files raise OSError/ValueError.
+    """
+    with open(index_path) as f:
+        index = json.load(f)
+    if index.get("model") != model:
+        return None
+    with open(pack_path, "rb") as f:
+        blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(blob) != index.get("pack_bytes"):
+        blob.close()
+        return None
+    return index, blob
+
+def find_clip(pack, text, voice):
+    index, blob = pack
+    entry = index.get("clips", {}).get(voice, {}).get(text.strip())
+    if entry is None:
+        return None
+    offset, length = entry
+    return blob[offset:offset + length]
+
+if __name__ == "__main__":
+    import openai
+    import toml
+
+    try:
+        secrets = toml.load(".streamlit/secrets.toml")
+        client = openai.OpenAI(api_key=secrets["OPENAI_API_KEY"])
+
+        for voice in VOICES:
+            os.makedirs(os.path.join(PARTS_DIR, voice), exist_ok=True)
+
+        jobs = [(v, p) for v in VOICES for p in PHRASES if not os.path.exists(part_path(v, p))]
+        total = len(VOICES) * len(PHRASES)
+        print(f"{total - len(jobs)}/{total} clips already rendered, {len(jobs)} to go.")
+
+        start = time.monotonic()
+        rendered_bytes = 0
+        failures = 0
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            futures = {pool.submit(render, client, v, p): (v, p) for v, p in jobs}
+            for i, future in enumerate(as_completed(futures), 1):
+                voice, phrase = futures[future]
+                try:
+                    rendered_bytes += future.result()
+                    print(f"[{i}/{len(jobs)}] {voice}: {phrase}")
+                except Exception as e:
+                    failures += 1
+                    print(f"[{i}/{len(jobs)}] {voice}: {phrase} FAILED ({e})")
+        elapsed = time.monotonic() - start
+
+        if jobs:
+            done = len(jobs) - failures
+            print(f"Rendered {done} clips in {elapsed:.1f}s "
+                  f"({done / elapsed:.2f} clips/s, {rendered_bytes / 1024 / max(elapsed, 1e-9):.1f} KiB/s).")
+        if failures:
+            print(f"{failures} clips failed; re-run to resume.")
+            sys.exit(1)
+
+        size = write_pack()
+        print(f"Wrote {PACK_PATH} ({size / 1024:.1f} KiB, {total} clips) and {INDEX_PATH}.")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
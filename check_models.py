@@ -1,21 +1,126 @@
+import threading
+import time
 
-import openai
-import toml
-
-try:
-    secrets = toml.load(".streamlit/secrets.toml")
-    api_key = secrets["OPENAI_API_KEY"]
-    client = openai.OpenAI(api_key=api_key)
-    
-    print("Fetching available models...")
-    models = client.models.list()
-    
-    available = [m.id for m in models]
-    available.sort()
-    
-    print(f"Found {len(available)} models.")
-    for m in available:
-        print(f"- {m}")
-            
-except Exception as e:
-    print(f"Error: {e}")
+# Model names used across the app, plus the catalog cache and warm-up probes.
+# app.py re-probes every CATALOG_TTL_S in the background (see get_model_health)
+# and serves the result at ?health; running this file directly prints the same
+# report to stdout.
+
+PRIMARY_MODEL = "gpt-5.2"
+HEDGE_MODEL = "gpt-5-mini"
+TRANSCRIBE_MODEL = "whisper-1"
+TTS_MODEL = "tts-1"
+
+# model -> kind, which decides how the model is probed
+CONFIGURED_MODELS = {
+    PRIMARY_MODEL: "chat",
+    HEDGE_MODEL: "chat",
+    TRANSCRIBE_MODEL: "transcription",
+    TTS_MODEL: "tts",
+}
+
+CATALOG_TTL_S = 3600
+
+def probe_model(client, model, kind):
+    """Makes the cheapest real call for the model's kind and times it."""
+    start = time.monotonic()
+    try:
+        if kind == "chat":
+            client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": "ping"}],
+                max_completion_tokens=16
+            )
+        elif kind == "tts":
+            client.audio.speech.create(model=model, voice="alloy", input="ok").read()
+        else:
+            # Transcription needs real audio, so only check the model resolves
+            client.models.retrieve(model)
+        return {"model": model, "ok": True, "latency_s": round(time.monotonic() - start, 3), "error": None}
+    except Exception as e:
+        return {"model": model, "ok": False, "latency_s": round(time.monotonic() - start, 3), "error": str(e)}
+
+class ModelHealth:
+    """Caches the model catalog for CATALOG_TTL_S and holds the last warm-up results."""
+
+    def __init__(self, client, models=CONFIGURED_MODELS, ttl=CATALOG_TTL_S):
+        self.client = client
+        self.models = models
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.catalog_ids = None
+        self.catalog_fetched_at = 0.0
+        self.probes = {}
+        self.warmed_at = None
+        self.error = None
+
+    def catalog(self):
+        with self.lock:
+            if self.catalog_ids is None or time.monotonic() - self.catalog_fetched_at > self.ttl:
+                self.catalog_ids = sorted(m.id for m in self.client.models.list())
+                self.catalog_fetched_at = time.monotonic()
+            return self.catalog_ids
+
+    def warm_up(self):
+        try:
+            available = set(self.catalog())
+            self.error = None
+        except Exception as e:
+            self.error = f"Catalog fetch failed: {e}"
+            available = None
+        probes = {}
+        for model, kind in self.models.items():
+            if available is not None and model not in available:
+                probes[model] = {"model": model, "ok": False, "latency_s": None, "error": "Not in model catalog"}
+            else:
+                probes[model] = probe_model(self.client, model, kind)
+        self.probes = probes
+        self.warmed_at = time.time()
+
+    def run_forever(self):
+        # Each pass finds the catalog past its TTL, so it is refetched along with the probes
+        while True:
+            self.warm_up()
+            time.sleep(self.ttl)
+
+    def report(self):
+        probes = self.probes
+        warmed_at = self.warmed_at
+        age = time.time() - warmed_at if warmed_at is not None else None
+        # Results that outlived two refresh cycles mean the refresh loop is stuck
+        stale = age is None or age > 2 * self.ttl
+        return {
+            "ready": not stale and all(p["ok"] for p in probes.values()),
+            "warmed_at": warmed_at,
+            "age_s": round(age, 1) if age is not None else None,
+            "stale": stale,
+            "catalog_size": len(self.catalog_ids) if self.catalog_ids is not None else None,
+            "error": self.error,
+            "models": list(probes.values()),
+        }
+
+if __name__ == "__main__":
+    import openai
+    import toml
+
+    try:
+        secrets = toml.load(".streamlit/secrets.toml")
+        api_key = secrets["OPENAI_API_KEY"]
+        client = openai.OpenAI(api_key=api_key)
+
+        print("Fetching available models...")
+        health = ModelHealth(client)
+        available = health.catalog()
+
+        print(f"Found {len(available)} models.")
+        for m in available:
+            print(f"- {m}")
+
+        print("\nProbing configured models...")
+        health.warm_up()
+        for p in health.report()["models"]:
+            status = f"ok ({p['latency_s']}s)" if p["ok"] else f"FAILED: {p['error']}"
+            print(f"- {p['model']}: {status}")
+
+    except Exception as e:
+        print(f"Error: {e}")
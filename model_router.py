@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from check_models import PRIMARY_MODEL, HEDGE_MODEL
+
+# Suggestion routing: the primary model gets a head start; if it hasn't
+# streamed a first token by HEDGE_AFTER_S (or fails), the faster model is raced
+# against it. Nothing is allowed to run past TURN_BUDGET_S.
+TURN_BUDGET_S = 4.0
+HEDGE_AFTER_S = 1.2
+# A primary whose recent time-to-first-token p95 is above this is hedged immediately
+HEDGE_IMMEDIATELY_P95_S = TURN_BUDGET_S - HEDGE_AFTER_S
+FALLBACK_RESPONSES = ["Could you repeat that?", "One moment, please.", "Sorry, I didn't catch that."]
+
+class LatencyStats:
+    """Rolling per-model latency windows ("ttft" and "total"), shared across sessions.
+
+    Samples older than max_age_s are ignored, so a model recovers from a bad
+    patch even if it stops being picked.
+    """
+
+    def __init__(self, window=50, min_samples=5, max_age_s=600):
+        self.window = window
+        self.min_samples = min_samples
+        self.max_age_s = max_age_s
+        self.samples = {}
+        self.lock = threading.Lock()
+
+    def record(self, model, seconds, metric="total"):
+        with self.lock:
+            self.samples.setdefault((model, metric), deque(maxlen=self.window)).append((time.monotonic(), seconds))
+
+    def p95(self, model, metric="total"):
+        cutoff = time.monotonic() - self.max_age_s
+        with self.lock:
+            values = sorted(s for t, s in self.samples.get((model, metric), ()) if t >= cutoff)
+        if len(values) < self.min_samples:
+            return None
+        return values[min(len(values) - 1, int(0.95 * len(values)))]
+
+class _Attempt:
+    """One streamed request. Records its latencies exactly once.
+
+    An attempt abandoned before finishing (cancelled loser or deadline miss)
+    records its elapsed time as a lower bound, so slow models keep getting
+    samples even when they never win.
+    """
+
+    def __init__(self, model, stats):
+        self.model = model
+        self.stats = stats
+        self.start = time.monotonic()
+        self.first_token = threading.Event()
+        self.lock = threading.Lock()
+        self.closed = False
+        self.stream = None
+
+    def attach_stream(self, stream):
+        """Returns False if the attempt was abandoned while create() was still blocking."""
+        with self.lock:
+            self.stream = stream
+            return not self.closed
+
+    def abort(self):
+        # Closing the stream from here aborts the HTTP response the worker is blocked reading
+        self.close()
+        with self.lock:
+            stream = self.stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def mark_first_token(self):
+        with self.lock:
+            if self.closed or self.first_token.is_set():
+                return
+            self.first_token.set()
+            self.stats.record(self.model, time.monotonic() - self.start, "ttft")
+
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            elapsed = time.monotonic() - self.start
+            if not self.first_token.is_set():
+                self.stats.record(self.model, elapsed, "ttft")
+            self.stats.record(self.model, elapsed, "total")
+
+    def discard(self):
+        # Errors say nothing about latency; a fast failure must not look like a fast model
+        with self.lock:
+            self.closed = True
+
+def _stream_completion(client, model, prompt, cancel, attempt):
+    try:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "system", "content": "You are a helpful assistant."},
+                      {"role": "user", "content": prompt}],
+            stream=True
+        )
+        parts = []
+        try:
+            if not attempt.attach_stream(stream):
+                return None
+            for chunk in stream:
+                if cancel.is_set():
+                    return None
+                if chunk.choices and chunk.choices[0].delta.content:
+                    attempt.mark_first_token()
+                    parts.append(chunk.choices[0].delta.content)
+        finally:
+            stream.close()
+    except Exception:
+        attempt.discard()
+        raise
+    attempt.close()
+    return "".join(parts)
+
+def route_completion(client, prompt, stats, primary=PRIMARY_MODEL, hedge=HEDGE_MODEL,
+                     budget_s=TURN_BUDGET_S, hedge_after_s=HEDGE_AFTER_S,
+                     hedge_immediately_p95_s=HEDGE_IMMEDIATELY_P95_S):
+    """Returns (text, model) from whichever model finishes first within budget_s.
+
+    Returns (None, None) on a deadline miss and re-raises the last error if
+    every attempt failed. Losing and abandoned streams are closed on return;
+    the client should still carry a timeout of budget_s, since a request
+    still waiting on response headers has no stream to close yet.
+    """
+    start = time.monotonic()
+    deadline = start + budget_s
+    primary_ttft = stats.p95(primary, "ttft")
+    hedge_after = 0 if primary_ttft is not None and primary_ttft > hedge_immediately_p95_s else hedge_after_s
+
+    cancel = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=2)
+    attempts = {}
+
+    def launch(model):
+        attempt = _Attempt(model, stats)
+        future = pool.submit(_stream_completion, client, model, prompt, cancel, attempt)
+        attempts[future] = attempt
+        return future
+
+    primary_future = launch(primary)
+    primary_attempt = attempts[primary_future]
+    pending = {primary_future}
+    hedge_decided = False
+    error = None
+    try:
+        while True:
+            now = time.monotonic()
+            remaining = deadline - now
+            if not hedge_decided and remaining > 0:
+                primary_failed = error is not None
+                past_head_start = now - start >= hedge_after
+                if primary_failed or (past_head_start and not primary_attempt.first_token.is_set()):
+                    hedge_decided = True
+                    # While the primary is still alive, skip a hedge that can't beat the remaining budget
+                    hedge_p95 = stats.p95(hedge, "total")
+                    if primary_failed or hedge_p95 is None or hedge_p95 <= remaining:
+                        pending.add(launch(hedge))
+                elif past_head_start:
+                    hedge_decided = True
+            if not pending or remaining <= 0:
+                break
+            timeout = remaining if hedge_decided else min(remaining, start + hedge_after - now)
+            done, pending = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    text = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if text is not None:
+                    return text, attempts[future].model
+    finally:
+        cancel.set()
+        for attempt in attempts.values():
+            attempt.abort()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if not pending and error is not None:
+        raise error
+    return None, None
@@ -0,0 +1,157 @@
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Opt-in memory/resource profiler for long-running deployments. Enabled with
+# NEUROVOX_PROFILE=1; app.py then registers each session's state on every run
+# and shows the latest sample on the Admin page. Sizes are only measured on the
+# sampler thread. Each periodic sample is also appended as one JSON line to
+# NEUROVOX_METRICS_PATH, which is rotated to a single ".1" backup at max_bytes.
+
+PROFILE_ENV = "NEUROVOX_PROFILE"
+METRICS_PATH_ENV = "NEUROVOX_METRICS_PATH"
+DEFAULT_METRICS_PATH = "neurovox_metrics.jsonl"
+
+def profiling_enabled():
+    return os.environ.get(PROFILE_ENV) == "1"
+
+def object_size(value):
+    """Approximate retained size: pickled length where possible, shallow size otherwise."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+def open_file_count():
+    # Linux only; elsewhere the counter is reported as None
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+def temp_mp3_usage():
+    count = 0
+    total = 0
+    tmp_dir = tempfile.gettempdir()
+    try:
+        entries = list(os.scandir(tmp_dir))
+    except OSError:
+        entries = []
+    for entry in entries:
+        # Other processes share /tmp; files can vanish mid-scan
+        try:
+            if entry.name.endswith(".mp3") and entry.is_file():
+                total += entry.stat().st_size
+                count += 1
+        except OSError:
+            continue
+    return {"dir": tmp_dir, "mp3_files": count, "mp3_bytes": total}
+
+class Profiler:
+    """Takes a tracemalloc snapshot every interval_s and diffs it against the previous one."""
+
+    def __init__(self, metrics_path=None, interval_s=60, top_n=15, session_ttl_s=3600, state_ttl_s=120,
+                 max_bytes=5 * 1024 * 1024):
+        self.metrics_path = metrics_path or os.environ.get(METRICS_PATH_ENV, DEFAULT_METRICS_PATH)
+        self.max_bytes = max_bytes
+        self.interval_s = interval_s
+        self.top_n = top_n
+        self.session_ttl_s = session_ttl_s
+        self.state_ttl_s = state_ttl_s
+        self.lock = threading.Lock()
+        self.sample_lock = threading.Lock()
+        self.sessions = {}
+        self.previous = None
+        self.latest = None
+        self.last_error = None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def register_session(self, session_id, state):
+        """Cheap enough for every rerun: keeps a reference, sizing happens in sample().
+
+        The reference is dropped as soon as it has been sized, so the profiler
+        never keeps a session's values alive for longer than one interval.
+        """
+        with self.lock:
+            entry = self.sessions.setdefault(session_id, {"bytes": None, "keys": {}})
+            entry["seen_at"] = time.time()
+            entry["state"] = state
+
+    def _run(self):
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                self.last_error = {"ts": time.time(), "error": f"{type(e).__name__}: {e}"}
+            time.sleep(self.interval_s)
+
+    def sample(self):
+        with self.sample_lock:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if self.previous is None:
+                stats = snapshot.statistics("lineno")
+                top = [{"where": str(s.traceback), "size_kib": round(s.size / 1024, 1), "diff_kib": None, "count": s.count}
+                       for s in stats[:self.top_n]]
+            else:
+                stats = snapshot.compare_to(self.previous, "lineno")
+                top = [{"where": str(s.traceback), "size_kib": round(s.size / 1024, 1), "diff_kib": round(s.size_diff / 1024, 1), "count": s.count}
+                       for s in stats[:self.top_n]]
+            self.previous = snapshot
+
+            now = time.time()
+            with self.lock:
+                # Sessions that stopped rerunning are assumed closed
+                self.sessions = {sid: s for sid, s in self.sessions.items() if now - s["seen_at"] < self.session_ttl_s}
+                states = {}
+                for sid, s in self.sessions.items():
+                    if s["state"] is not None and now - s["seen_at"] < self.state_ttl_s:
+                        states[sid] = s["state"]
+                    s["state"] = None
+            sizes_by_session = {
+                sid: {str(key): object_size(value) for key, value in list(state.items())}
+                for sid, state in states.items()
+            }
+            del states
+            with self.lock:
+                for sid, sizes in sizes_by_session.items():
+                    if sid in self.sessions:
+                        self.sessions[sid]["bytes"] = sum(sizes.values())
+                        self.sessions[sid]["keys"] = sizes
+                sessions = {sid: {"bytes": s["bytes"], "keys": dict(s["keys"])}
+                            for sid, s in self.sessions.items() if s["bytes"] is not None}
+
+            current, peak = tracemalloc.get_traced_memory()
+            sample = {
+                "ts": now,
+                "traced_kib": round(current / 1024, 1),
+                "traced_peak_kib": round(peak / 1024, 1),
+                "open_files": open_file_count(),
+                "temp": temp_mp3_usage(),
+                "sessions": sessions,
+                "top_allocations": top,
+                "last_error": self.last_error,
+            }
+            self._append(json.dumps(sample) + "\n")
+            self.latest = sample
+            return sample
+
+    def _append(self, line):
+        try:
+            if os.path.getsize(self.metrics_path) + len(line) > self.max_bytes:
+                os.replace(self.metrics_path, self.metrics_path + ".1")
+        except OSError:
+            pass
+        with open(self.metrics_path, "a") as f:
+            f.write(line)
@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+
+import build_voice_pack
+from build_voice_pack import VOICES, PHRASES, PACK_PATH, INDEX_PATH, part_path, write_pack, read_pack, find_clip
+
+@pytest.fixture
+def parts(tmp_path, monkeypatch):
+    """Stub clips for every (voice, phrase), written where the renderer would cache them."""
+    monkeypatch.chdir(tmp_path)
+    clips = {}
+    for voice in VOICES:
+        os.makedirs(os.path.dirname(part_path(voice, PHRASES[0])), exist_ok=True)
+        for i, phrase in enumerate(PHRASES):
+            data = f"{voice}:{phrase}".encode("utf-8") * (i + 1)
+            with open(part_path(voice, phrase), "wb") as f:
+                f.write(data)
+            clips[voice, phrase] = data
+    return clips
+
+def test_round_trip(parts):
+    size = write_pack()
+    assert size == sum(len(d) for d in parts.values())
+    assert not os.path.exists(PACK_PATH + ".part") and not os.path.exists(INDEX_PATH + ".part")
+
+    pack = read_pack()
+    for (voice, phrase), data in parts.items():
+        assert find_clip(pack, phrase, voice) == data
+    assert find_clip(pack, "Not in the bank.", VOICES[0]) is None
+    assert find_clip(pack, PHRASES[0], "robot") is None
+
+def test_model_mismatch_is_rejected(parts):
+    write_pack()
+    assert read_pack(model="some-other-tts") is None
+
+def test_new_pack_with_old_index_is_rejected(parts):
+    write_pack()
+    with open(INDEX_PATH) as f:
+        old_index = f.read()
+    with open(part_path(VOICES[0], PHRASES[0]), "ab") as f:
+        f.write(b"rerendered")
+    write_pack()
+    with open(INDEX_PATH, "w") as f:
+        f.write(old_index)
+    assert read_pack() is None
+
+def test_rebuilt_pack_is_read_fresh(parts):
+    write_pack()
+    with open(part_path(VOICES[0], PHRASES[0]), "wb") as f:
+        f.write(b"new clip")
+    write_pack()
+    assert find_clip(read_pack(), PHRASES[0], VOICES[0]) == b"new clip"
+
+def test_missing_or_corrupt_pack_raises_for_the_loader(parts):
+    with pytest.raises(OSError):
+        read_pack()
+    write_pack()
+    with open(INDEX_PATH, "w") as f:
+        f.write('{"model": ')
+    with pytest.raises(ValueError):
+        read_pack()
+
+def test_index_records_model_and_preview(parts):
+    write_pack()
+    with open(INDEX_PATH) as f:
+        index = json.load(f)
+    assert index["model"] == build_voice_pack.TTS_MODEL
+    assert index["preview"] in PHRASES
@@ -0,0 +1,39 @@
+import time
+from types import SimpleNamespace
+
+from check_models import ModelHealth
+
+class StubClient:
+    def __init__(self, ids):
+        self.ids = ids
+        self.list_calls = 0
+        self.models = SimpleNamespace(list=self.list_models, retrieve=lambda model: None)
+
+    def list_models(self):
+        self.list_calls += 1
+        return [SimpleNamespace(id=i) for i in self.ids]
+
+def test_catalog_is_refetched_after_ttl():
+    client = StubClient(["whisper-1"])
+    health = ModelHealth(client, {"whisper-1": "transcription"}, ttl=0.05)
+    health.warm_up()
+    assert health.report()["ready"]
+
+    client.ids = []
+    health.warm_up()
+    assert client.list_calls == 1
+    time.sleep(0.06)
+    health.warm_up()
+    report = health.report()
+    assert client.list_calls == 2
+    assert not report["ready"]
+    assert report["models"][0]["error"] == "Not in model catalog"
+
+def test_results_go_stale_without_refresh():
+    health = ModelHealth(StubClient(["whisper-1"]), {"whisper-1": "transcription"}, ttl=0.02)
+    assert not health.report()["ready"]
+    health.warm_up()
+    assert health.report()["age_s"] is not None
+    time.sleep(0.05)
+    report = health.report()
+    assert report["stale"] and not report["ready"]
@@ -0,0 +1,104 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from model_router import LatencyStats, route_completion
+
+PRIMARY = "primary"
+HEDGE = "hedge"
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class StubStream:
+    def __init__(self, steps):
+        self.steps = steps
+        self.closed = threading.Event()
+        self.finished = threading.Event()
+
+    def __iter__(self):
+        try:
+            for delay, item in self.steps:
+                # Like a real HTTP stream, close() from another thread aborts a blocked read
+                if self.closed.wait(delay):
+                    raise ConnectionError("stream closed")
+                if isinstance(item, Exception):
+                    raise item
+                yield chunk(item)
+        finally:
+            self.finished.set()
+
+    def close(self):
+        self.closed.set()
+
+class StubClient:
+    """Streams scripted (delay, text-or-exception) steps per model and logs when each call started."""
+
+    def __init__(self, scripts):
+        self.scripts = scripts
+        self.started = {}
+        self.streams = {}
+        self.t0 = time.monotonic()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, stream):
+        self.started[model] = time.monotonic() - self.t0
+        self.streams[model] = StubStream(self.scripts[model])
+        return self.streams[model]
+
+def route(client, stats, **kwargs):
+    kwargs.setdefault("budget_s", 1.0)
+    kwargs.setdefault("hedge_after_s", 0.3)
+    kwargs.setdefault("hedge_immediately_p95_s", 0.7)
+    return route_completion(client, "prompt", stats, primary=PRIMARY, hedge=HEDGE, **kwargs)
+
+def test_fast_primary_is_not_hedged():
+    client = StubClient({PRIMARY: [(0.0, "a|b|c")], HEDGE: [(0.0, "x")]})
+    assert route(client, LatencyStats()) == ("a|b|c", PRIMARY)
+    assert HEDGE not in client.started
+
+def test_slow_primary_is_hedged_after_head_start():
+    client = StubClient({PRIMARY: [(0.8, "slow")], HEDGE: [(0.0, "fast")]})
+    assert route(client, LatencyStats()) == ("fast", HEDGE)
+    assert client.started[HEDGE] == pytest.approx(0.3, abs=0.1)
+
+def test_deadline_misses_trigger_immediate_hedge():
+    stats = LatencyStats(min_samples=3)
+    stalled = {PRIMARY: [(2.0, "never")], HEDGE: [(2.0, "never")]}
+    for _ in range(3):
+        assert route(StubClient(stalled), stats) == (None, None)
+    assert stats.p95(PRIMARY, "ttft") > 0.7
+
+    client = StubClient({PRIMARY: [(0.8, "slow")], HEDGE: [(0.0, "fast")]})
+    assert route(client, stats) == ("fast", HEDGE)
+    assert client.started[HEDGE] < 0.1
+
+def test_cancelled_loser_still_records_latency():
+    stats = LatencyStats(min_samples=1)
+    client = StubClient({PRIMARY: [(0.8, "slow")], HEDGE: [(0.0, "fast")]})
+    route(client, stats)
+    assert stats.p95(PRIMARY, "ttft") >= 0.3
+    assert stats.p95(HEDGE, "total") is not None
+
+def test_primary_failing_after_first_token_is_hedged():
+    client = StubClient({PRIMARY: [(0.0, "partial"), (0.05, RuntimeError("dropped"))], HEDGE: [(0.0, "fast")]})
+    assert route(client, LatencyStats()) == ("fast", HEDGE)
+
+def test_hedge_skipped_when_it_cannot_beat_the_budget():
+    stats = LatencyStats(min_samples=1)
+    stats.record(HEDGE, 5.0, "total")
+    client = StubClient({PRIMARY: [(0.5, "slow")], HEDGE: [(0.0, "fast")]})
+    assert route(client, stats) == ("slow", PRIMARY)
+    assert HEDGE not in client.started
+
+def test_all_attempts_failing_raises():
+    client = StubClient({PRIMARY: [(0.0, RuntimeError("down"))], HEDGE: [(0.0, RuntimeError("down too"))]})
+    with pytest.raises(RuntimeError):
+        route(client, LatencyStats())
+
+def test_losing_stream_is_aborted():
+    client = StubClient({PRIMARY: [(5.0, "never")], HEDGE: [(0.0, "fast")]})
+    assert route(client, LatencyStats()) == ("fast", HEDGE)
+    assert client.streams[PRIMARY].finished.wait(0.5)
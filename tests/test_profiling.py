@@ -0,0 +1,77 @@
+import os
+import tracemalloc
+import weakref
+
+import pytest
+
+import profiling
+from profiling import Profiler, temp_mp3_usage
+
+@pytest.fixture
+def profiler(tmp_path):
+    tracemalloc.start()
+    yield Profiler(metrics_path=str(tmp_path / "metrics.jsonl"), max_bytes=4096)
+    tracemalloc.stop()
+
+def test_sessions_are_sized_on_sample_not_on_register(profiler, monkeypatch):
+    calls = []
+    monkeypatch.setattr(profiling, "object_size", lambda value: calls.append(value) or 10)
+    profiler.register_session("s1", {"a": 1, "b": 2})
+    assert calls == []
+    sample = profiler.sample()
+    assert sample["sessions"] == {"s1": {"bytes": 20, "keys": {"a": 10, "b": 10}}}
+
+def test_metrics_file_is_rotated(profiler):
+    for _ in range(5):
+        profiler.sample()
+    assert os.path.getsize(profiler.metrics_path) <= profiler.max_bytes
+    assert os.path.exists(profiler.metrics_path + ".1")
+
+def test_temp_scan_skips_files_that_vanish(tmp_path, monkeypatch):
+    (tmp_path / "kept.mp3").write_bytes(b"x" * 100)
+    (tmp_path / "gone.mp3").write_bytes(b"x")
+    monkeypatch.setattr(profiling.tempfile, "gettempdir", lambda: str(tmp_path))
+    real_scandir = os.scandir
+
+    def scandir_then_delete(path):
+        entries = list(real_scandir(path))
+        os.remove(tmp_path / "gone.mp3")
+        return iter(entries)
+
+    monkeypatch.setattr(profiling.os, "scandir", scandir_then_delete)
+    usage = temp_mp3_usage()
+    assert (usage["mp3_files"], usage["mp3_bytes"]) == (1, 100)
+
+def test_session_state_is_released_after_sizing(profiler):
+    class Blob:
+        pass
+
+    value = Blob()
+    ref = weakref.ref(value)
+    profiler.register_session("s1", {"blob": value})
+    del value
+    assert ref() is not None
+    profiler.sample()
+    assert ref() is None
+    # Sizes survive for the idle session until session_ttl_s
+    assert "blob" in profiler.sample()["sessions"]["s1"]["keys"]
+
+def test_stale_state_is_dropped_unsized(tmp_path):
+    profiler = Profiler(metrics_path=str(tmp_path / "m.jsonl"), state_ttl_s=0)
+    tracemalloc.start()
+    try:
+        profiler.register_session("s1", {"a": 1})
+        assert "s1" not in profiler.sample()["sessions"]
+        assert profiler.sessions["s1"]["state"] is None
+    finally:
+        tracemalloc.stop()
+
+def test_sampler_errors_are_kept_on_the_profiler(profiler, monkeypatch):
+    def fail():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(profiler, "sample", fail)
+    monkeypatch.setattr(profiling.time, "sleep", lambda s: (_ for _ in ()).throw(SystemExit))
+    with pytest.raises(SystemExit):
+        profiler._run()
+    assert profiler.last_error["error"] == "RuntimeError: boom"